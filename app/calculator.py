@@ -234,10 +234,11 @@ class Calculator:
 
     def save_history(self) -> None:
         """
-        Save calculation history to a CSV file using pandas.
+        Save calculation history to a file using pandas.
 
-        Serializes the history of calculations and writes them to a CSV file for
-        persistent storage. Utilizes pandas DataFrames for efficient data handling.
+        Serializes the history of calculations and writes them to a file in the
+        configured history format (CSV, Feather or Parquet) for persistent storage.
+        Utilizes pandas DataFrames for efficient data handling.
 
         Raises:
             OperationError: If saving the history fails.
@@ -260,13 +261,14 @@ class Calculator:
             if history_data:
                 # Create a pandas DataFrame from the history data
                 df = pd.DataFrame(history_data)
-                # Write the DataFrame to a CSV file without the index
-                df.to_csv(self.config.history_file, index=False)
+                # Write the DataFrame to the history file without the index
+                self._write_history_frame(df)
                 logging.info(f"History saved successfully to {self.config.history_file}")
             else:
-                # If history is empty, create an empty CSV with headers
-                pd.DataFrame(columns=['operation', 'operand1', 'operand2', 'result', 'timestamp']
-                           ).to_csv(self.config.history_file, index=False)
+                # If history is empty, create an empty file with headers
+                self._write_history_frame(
+                    pd.DataFrame(columns=['operation', 'operand1', 'operand2', 'result', 'timestamp'])
+                )
                 logging.info("Empty history saved")
 
         except Exception as e:
@@ -276,18 +278,18 @@ class Calculator:
 
     def load_history(self) -> None:
         """
-        Load calculation history from a CSV file using pandas.
+        Load calculation history from a file using pandas.
 
-        Reads the calculation history from a CSV file and reconstructs the
-        Calculation instances, restoring the calculator's history.
+        Reads the calculation history from a file in the configured history format
+        and reconstructs the Calculation instances, restoring the calculator's history.
 
         Raises:
             OperationError: If loading the history fails.
         """
         try:
             if self.config.history_file.exists():
-                # Read the CSV file into a pandas DataFrame
-                df = pd.read_csv(self.config.history_file)
+                # Read the history file into a pandas DataFrame
+                df = self._read_history_frame()
                 if not df.empty:
                     # Deserialize each row into a Calculation instance
                     self.history = [
@@ -311,6 +313,35 @@ class Calculator:
             logging.error(f"Failed to load history: {e}")
             raise OperationError(f"Failed to load history: {e}")
 
+    def _write_history_frame(self, df: pd.DataFrame) -> None:
+        """
+        Write a history DataFrame in the configured format.
+
+        Args:
+            df (pd.DataFrame): The history data to write.
+        """
+        history_format = self.config.history_format
+        if history_format == 'feather':
+            df.to_feather(self.config.history_file)
+        elif history_format == 'parquet':
+            df.to_parquet(self.config.history_file, index=False)
+        else:
+            df.to_csv(self.config.history_file, index=False)
+
+    def _read_history_frame(self) -> pd.DataFrame:
+        """
+        Read the history file in the configured format.
+
+        Returns:
+            pd.DataFrame: The history data read from file.
+        """
+        history_format = self.config.history_format
+        if history_format == 'feather':
+            return pd.read_feather(self.config.history_file)
+        if history_format == 'parquet':
+            return pd.read_parquet(self.config.history_file)
+        return pd.read_csv(self.config.history_file)
+
     def get_history_dataframe(self) -> pd.DataFrame:
         """
         Get calculation history as a pandas DataFrame.
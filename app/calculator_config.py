@@ -16,6 +16,9 @@ from app.exceptions import ConfigurationError
 # Load environment variables from a .env file into the program's environment
 load_dotenv()
 
+# File formats supported for persisting calculation history
+SUPPORTED_HISTORY_FORMATS = ('csv', 'feather', 'parquet')
+
 
 def get_project_root() -> Path:
     """
@@ -40,7 +43,8 @@ class CalculatorConfig:
 
     This class manages all configuration parameters required by the calculator
     application, including directory paths, history size, auto-save preferences,
-    calculation precision, maximum input values, and default encoding.
+    calculation precision, maximum input values, default encoding, and the file
+    format used for persisting history.
 
     Configuration can be set via environment variables or by passing parameters
     directly to the class constructor.
@@ -53,7 +57,8 @@ class CalculatorConfig:
         auto_save: Optional[bool] = None,
         precision: Optional[int] = None,
         max_input_value: Optional[Number] = None,
-        default_encoding: Optional[str] = None
+        default_encoding: Optional[str] = None,
+        history_format: Optional[str] = None
     ):
         """
         Initialize configuration with environment variables and defaults.
@@ -65,6 +70,7 @@ class CalculatorConfig:
             precision (Optional[int], optional): Number of decimal places for calculations. Defaults to None.
             max_input_value (Optional[Number], optional): Maximum allowed input value. Defaults to None.
             default_encoding (Optional[str], optional): Default encoding for file operations. Defaults to None.
+            history_format (Optional[str], optional): File format for history ('csv', 'feather' or 'parquet'). Defaults to None.
         """
         # Set base directory to project root by default
         project_root = get_project_root()
@@ -98,66 +104,138 @@ class CalculatorConfig:
             'CALCULATOR_DEFAULT_ENCODING', 'utf-8'
         )
 
+        # File format used to save and load history
+        self.history_format = (history_format or os.getenv(
+            'CALCULATOR_HISTORY_FORMAT', 'csv'
+        )).lower()
+
+        # Explicitly assigned paths take precedence over environment variables
+        self._log_dir: Optional[Path] = None
+        self._history_dir: Optional[Path] = None
+        self._history_file: Optional[Path] = None
+        self._log_file: Optional[Path] = None
+
     @property
     def log_dir(self) -> Path:
         """
         Get log directory path.
 
-        Determines the directory path where log files will be stored.
+        Determines the directory path where log files will be stored, unless
+        one has been assigned explicitly.
 
         Returns:
             Path: The log directory path.
         """
+        if self._log_dir is not None:
+            return self._log_dir
         return Path(os.getenv(
             'CALCULATOR_LOG_DIR',
             str(self.base_dir / "logs")
         )).resolve()
 
+    @log_dir.setter
+    def log_dir(self, value: Path) -> None:
+        """
+        Set log directory path.
+
+        Overrides the value derived from environment variables and base_dir.
+
+        Args:
+            value (Path): The log directory path to use.
+        """
+        self._log_dir = Path(value).resolve()
+
     @property
     def history_dir(self) -> Path:
         """
         Get history directory path.
 
-        Determines the directory path where calculation history files will be stored.
+        Determines the directory path where calculation history files will be
+        stored, unless one has been assigned explicitly.
 
         Returns:
             Path: The history directory path.
         """
+        if self._history_dir is not None:
+            return self._history_dir
         return Path(os.getenv(
             'CALCULATOR_HISTORY_DIR',
             str(self.base_dir / "history")
         )).resolve()
 
+    @history_dir.setter
+    def history_dir(self, value: Path) -> None:
+        """
+        Set history directory path.
+
+        Overrides the value derived from environment variables and base_dir.
+
+        Args:
+            value (Path): The history directory path to use.
+        """
+        self._history_dir = Path(value).resolve()
+
     @property
     def history_file(self) -> Path:
         """
         Get history file path.
 
-        Determines the file path for storing calculation history in CSV format.
+        Determines the file path for storing calculation history. The file
+        extension follows the configured history format. An explicitly assigned
+        path takes precedence.
 
         Returns:
             Path: The history file path.
         """
+        if self._history_file is not None:
+            return self._history_file
         return Path(os.getenv(
             'CALCULATOR_HISTORY_FILE',
-            str(self.history_dir / "calculator_history.csv")
+            str(self.history_dir / f"calculator_history.{self.history_format}")
         )).resolve()
 
+    @history_file.setter
+    def history_file(self, value: Path) -> None:
+        """
+        Set history file path.
+
+        Overrides the value derived from environment variables and base_dir.
+
+        Args:
+            value (Path): The history file path to use.
+        """
+        self._history_file = Path(value).resolve()
+
     @property
     def log_file(self) -> Path:
         """
         Get log file path.
 
-        Determines the file path for storing log entries.
+        Determines the file path for storing log entries, unless one has been
+        assigned explicitly.
 
         Returns:
             Path: The log file path.
         """
+        if self._log_file is not None:
+            return self._log_file
         return Path(os.getenv(
             'CALCULATOR_LOG_FILE',
             str(self.log_dir / "calculator.log")
         )).resolve()
 
+    @log_file.setter
+    def log_file(self, value: Path) -> None:
+        """
+        Set log file path.
+
+        Overrides the value derived from environment variables and base_dir.
+
+        Args:
+            value (Path): The log file path to use.
+        """
+        self._log_file = Path(value).resolve()
+
     def validate(self) -> None:
         """
         Validate configuration settings.
@@ -174,3 +252,7 @@ class CalculatorConfig:
             raise ConfigurationError("precision must be positive")
         if self.max_input_value <= 0:
             raise ConfigurationError("max_input_value must be positive")
+        if self.history_format not in SUPPORTED_HISTORY_FORMATS:
+            raise ConfigurationError(
+                f"history_format must be one of: {', '.join(SUPPORTED_HISTORY_FORMATS)}"
+            )
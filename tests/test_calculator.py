@@ -1,39 +1,88 @@
-import datetime
-from pathlib import Path
+from contextlib import ExitStack
+import os
 import pandas as pd
 import pytest
-from unittest.mock import Mock, patch, PropertyMock
+from unittest.mock import Mock, patch
 from decimal import Decimal
-from tempfile import TemporaryDirectory
 from app.calculator import Calculator
 from app.calculator_repl import calculator_repl
 from app.calculator_config import CalculatorConfig
 from app.exceptions import OperationError, ValidationError
 from app.history import LoggingObserver, AutoSaveObserver
-from app.operations import OperationFactory
-from unittest.mock import MagicMock
+from app.operations import Operation, OperationFactory
+
+# Addition is a stateless strategy, so one instance is shared across tests
+ADD_OP = OperationFactory.create_operation('add')
+
+# One-row history returned by the mocked readers, built once at import time
+_FAKE_HISTORY_DF = pd.DataFrame({
+    'operation': ['Addition'],
+    'operand1': ['2'],
+    'operand2': ['3'],
+    'result': ['5'],
+    'timestamp': ['2024-01-01T00:00:00']
+})
+
+# Stub pandas CSV I/O once for the whole module; tests needing custom behaviour patch on top
+@pytest.fixture(scope="module", autouse=True)
+def _stub_pandas_io():
+    empty_history = pd.DataFrame(columns=['operation', 'operand1', 'operand2', 'result', 'timestamp'])
+    with ExitStack() as stack:
+        mock_to_csv = stack.enter_context(patch("app.calculator.pd.DataFrame.to_csv"))
+        mock_read_csv = stack.enter_context(patch("app.calculator.pd.read_csv", return_value=empty_history))
+        yield mock_to_csv, mock_read_csv
+
+# Session-wide temporary directory shared by every Calculator fixture instance.
+# Named per pytest-xdist worker so parallel workers never share files.
+@pytest.fixture(scope="session")
+def _calc_tempdir(tmp_path_factory):
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "master")
+    return tmp_path_factory.mktemp(f"calc_{worker_id}")
+
+# Real pandas CSV I/O, captured before _stub_pandas_io replaces it
+_REAL_TO_CSV = pd.DataFrame.to_csv
+_REAL_READ_CSV = pd.read_csv
+
+# Fixture to restore real CSV I/O for tests that write and read actual files
+@pytest.fixture
+def real_pandas_io():
+    with ExitStack() as stack:
+        stack.enter_context(patch("app.calculator.pd.DataFrame.to_csv", _REAL_TO_CSV))
+        stack.enter_context(patch("app.calculator.pd.read_csv", _REAL_READ_CSV))
+        yield
+
+def _make_config(base_dir, history_format='csv'):
+    config = CalculatorConfig(base_dir=base_dir, history_format=history_format)
+
+    # Assign paths within the directory; these take precedence over environment variables.
+    # history_file is left to follow history_dir and the format's file extension.
+    config.log_dir = base_dir / "logs"
+    config.log_file = base_dir / "logs/calculator.log"
+    config.history_dir = base_dir / "history"
+    return config
+
+# Fixture to initialize Calculator with a temporary directory for file paths.
+# Parametrize it indirectly with a history format to use something other than CSV.
+@pytest.fixture
+def calculator(_calc_tempdir, monkeypatch, request):
+    # test_config.py sets CALCULATOR_HISTORY_FILE at import, which would pin the file path
+    monkeypatch.delenv('CALCULATOR_HISTORY_FILE', raising=False)
+    config = _make_config(_calc_tempdir, getattr(request, "param", 'csv'))
 
-# Fixture to initialize Calculator with a temporary directory for file paths
+    # Return an instance of Calculator with a clean state, since the directory is shared
+    calc = Calculator(config=config)
+    calc.clear_history()
+    yield calc
+
+# Fixture to keep the REPL's default Calculator inside the worker's temporary directory
 @pytest.fixture
-def calculator():
-    with TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        config = CalculatorConfig(base_dir=temp_path)
-
-        # Patch properties to use the temporary directory paths
-        with patch.object(CalculatorConfig, 'log_dir', new_callable=PropertyMock) as mock_log_dir, \
-             patch.object(CalculatorConfig, 'log_file', new_callable=PropertyMock) as mock_log_file, \
-             patch.object(CalculatorConfig, 'history_dir', new_callable=PropertyMock) as mock_history_dir, \
-             patch.object(CalculatorConfig, 'history_file', new_callable=PropertyMock) as mock_history_file:
-            
-            # Set return values to use paths within the temporary directory
-            mock_log_dir.return_value = temp_path / "logs"
-            mock_log_file.return_value = temp_path / "logs/calculator.log"
-            mock_history_dir.return_value = temp_path / "history"
-            mock_history_file.return_value = temp_path / "history/calculator_history.csv"
-            
-            # Return an instance of Calculator with the mocked config
-            yield Calculator(config=config)
+def repl_env(_calc_tempdir, monkeypatch):
+    monkeypatch.setenv('CALCULATOR_LOG_DIR', str(_calc_tempdir / "logs"))
+    monkeypatch.setenv('CALCULATOR_LOG_FILE', str(_calc_tempdir / "logs/calculator.log"))
+    monkeypatch.setenv('CALCULATOR_HISTORY_DIR', str(_calc_tempdir / "history"))
+    monkeypatch.setenv('CALCULATOR_HISTORY_FILE', str(_calc_tempdir / "history/calculator_history.csv"))
+    # Disable auto-save so only explicit 'save' and 'exit' commands save the history
+    monkeypatch.setenv('CALCULATOR_AUTO_SAVE', 'false')
 
 # Test Calculator Initialization
 
@@ -46,15 +95,16 @@ def test_calculator_initialization(calculator):
 # Test Logging Setup
 
 @patch('app.calculator.logging.info')
-def test_logging_setup(logging_info_mock):
-    with patch.object(CalculatorConfig, 'log_dir', new_callable=PropertyMock) as mock_log_dir, \
-         patch.object(CalculatorConfig, 'log_file', new_callable=PropertyMock) as mock_log_file:
-        mock_log_dir.return_value = Path('/tmp/logs')
-        mock_log_file.return_value = Path('/tmp/logs/calculator.log')
-        
-        # Instantiate calculator to trigger logging
-        calculator = Calculator(CalculatorConfig())
-        logging_info_mock.assert_any_call("Calculator initialized with configuration")
+def test_logging_setup(logging_info_mock, tmp_path):
+    config = CalculatorConfig(base_dir=tmp_path)
+    config.log_dir = tmp_path / "logs"
+    config.log_file = tmp_path / "logs/calculator.log"
+    config.history_dir = tmp_path / "history"
+    config.history_file = tmp_path / "history/calculator_history.csv"
+
+    # Instantiate calculator to trigger logging
+    calculator = Calculator(config)
+    logging_info_mock.assert_any_call("Calculator initialized with configuration")
 
 # Test Adding and Removing Observers
 
@@ -72,15 +122,13 @@ def test_remove_observer(calculator):
 # Test Setting Operations
 
 def test_set_operation(calculator):
-    operation = OperationFactory.create_operation('add')
-    calculator.set_operation(operation)
-    assert calculator.operation_strategy == operation
+    calculator.set_operation(ADD_OP)
+    assert calculator.operation_strategy == ADD_OP
 
 # Test Performing Operations
 
 def test_perform_operation_addition(calculator):
-    operation = OperationFactory.create_operation('add')
-    calculator.set_operation(operation)
+    calculator.set_operation(ADD_OP)
     result = calculator.perform_operation(2, 3)
     assert result == Decimal('5')
 
@@ -156,7 +204,7 @@ def test_perform_operation_abs_diff(calculator):
     assert result == Decimal('15')    
 
 def test_perform_operation_validation_error(calculator):
-    calculator.set_operation(OperationFactory.create_operation('add'))
+    calculator.set_operation(ADD_OP)
     with pytest.raises(ValidationError):
         calculator.perform_operation('invalid', 3)
 
@@ -167,15 +215,13 @@ def test_perform_operation_operation_error(calculator):
 # Test Undo/Redo Functionality
 
 def test_undo(calculator):
-    operation = OperationFactory.create_operation('add')
-    calculator.set_operation(operation)
+    calculator.set_operation(ADD_OP)
     calculator.perform_operation(2, 3)
     calculator.undo()
     assert calculator.history == []
 
 def test_redo(calculator):
-    operation = OperationFactory.create_operation('add')
-    calculator.set_operation(operation)
+    calculator.set_operation(ADD_OP)
     calculator.perform_operation(2, 3)
     calculator.undo()
     calculator.redo()
@@ -183,45 +229,86 @@ def test_redo(calculator):
 
 # Test History Management
 
-@patch('app.calculator.pd.DataFrame.to_csv')
-def test_save_history(mock_to_csv, calculator):
-    operation = OperationFactory.create_operation('add')
-    calculator.set_operation(operation)
-    calculator.perform_operation(2, 3)
-    calculator.save_history()
-    mock_to_csv.assert_called_once()
+HISTORY_FORMATS = ["csv", "feather", "parquet"]
 
-@patch('app.calculator.pd.read_csv')
+@pytest.mark.parametrize("calculator", HISTORY_FORMATS, indirect=True)
+def test_save_history(calculator):
+    fmt = calculator.config.history_format
+    assert calculator.config.history_file.suffix == f".{fmt}"
+    calculator.set_operation(ADD_OP)
+    calculator.perform_operation(2, 3)
+    with patch(f'app.calculator.pd.DataFrame.to_{fmt}') as mock_writer:
+        calculator.save_history()
+        mock_writer.assert_called_once()
+
+@pytest.mark.parametrize("calculator", HISTORY_FORMATS, indirect=True)
+def test_save_empty_history(calculator):
+    fmt = calculator.config.history_format
+    with patch(f'app.calculator.pd.DataFrame.to_{fmt}') as mock_writer:
+        calculator.save_history()
+        mock_writer.assert_called_once()
+
+@pytest.mark.parametrize("calculator", HISTORY_FORMATS, indirect=True)
 @patch('app.calculator.Path.exists', return_value=True)
-def test_load_history(mock_exists, mock_read_csv, calculator):
-    # Mock CSV data to match the expected format in from_dict
-    mock_read_csv.return_value = pd.DataFrame({
-        'operation': ['Addition'],
-        'operand1': ['2'],
-        'operand2': ['3'],
-        'result': ['5'],
-        'timestamp': [datetime.datetime.now().isoformat()]
-    })
-    
-    # Test the load_history functionality
-    try:
-        calculator.load_history()
-        # Verify history length after loading
-        assert len(calculator.history) == 1
-        # Verify the loaded values
-        assert calculator.history[0].operation == "Addition"
-        assert calculator.history[0].operand1 == Decimal("2")
-        assert calculator.history[0].operand2 == Decimal("3")
-        assert calculator.history[0].result == Decimal("5")
-    except OperationError:
-        pytest.fail("Loading history failed due to OperationError")
-        
-            
+def test_load_history(mock_exists, calculator):
+    fmt = calculator.config.history_format
+    # Mock the reader for this format with data matching the expected format in from_dict
+    with patch(f'app.calculator.pd.read_{fmt}', return_value=_FAKE_HISTORY_DF) as mock_reader:
+        # Test the load_history functionality
+        try:
+            calculator.load_history()
+            mock_reader.assert_called_once()
+            # Verify history length after loading
+            assert len(calculator.history) == 1
+            # Verify the loaded values
+            assert calculator.history[0].operation == "Addition"
+            assert calculator.history[0].operand1 == Decimal("2")
+            assert calculator.history[0].operand2 == Decimal("3")
+            assert calculator.history[0].result == Decimal("5")
+        except OperationError:
+            pytest.fail("Loading history failed due to OperationError")
+
+# Round-trip real history files through each format
+@pytest.mark.slow
+@pytest.mark.parametrize("fmt", HISTORY_FORMATS)
+def test_history_round_trip(fmt, tmp_path, monkeypatch, real_pandas_io):
+    if fmt != 'csv':
+        pytest.importorskip("pyarrow")
+    monkeypatch.delenv('CALCULATOR_HISTORY_FILE', raising=False)
+    config = _make_config(tmp_path, fmt)
+    calc = Calculator(config=config)
+    calc.set_operation(ADD_OP)
+    calc.perform_operation(2, 3)
+    calc.save_history()
+    assert config.history_file == tmp_path / f"history/calculator_history.{fmt}"
+    assert config.history_file.exists()
+
+    # A new Calculator loads the saved history on initialization
+    loaded = Calculator(config=config)
+    assert len(loaded.history) == 1
+    assert loaded.history[0].operation == "Addition"
+    assert loaded.history[0].operand1 == Decimal("2")
+    assert loaded.history[0].operand2 == Decimal("3")
+    assert loaded.history[0].result == Decimal("5")
+    assert loaded.history[0].timestamp == calc.history[0].timestamp
+
+@pytest.mark.slow
+@pytest.mark.parametrize("fmt", HISTORY_FORMATS)
+def test_empty_history_round_trip(fmt, tmp_path, monkeypatch, real_pandas_io):
+    if fmt != 'csv':
+        pytest.importorskip("pyarrow")
+    monkeypatch.delenv('CALCULATOR_HISTORY_FILE', raising=False)
+    config = _make_config(tmp_path, fmt)
+    Calculator(config=config).save_history()
+    assert config.history_file.exists()
+
+    loaded = Calculator(config=config)
+    assert loaded.history == []
+
 # Test Clearing History
 
 def test_clear_history(calculator):
-    operation = OperationFactory.create_operation('add')
-    calculator.set_operation(operation)
+    calculator.set_operation(ADD_OP)
     calculator.perform_operation(2, 3)
     calculator.clear_history()
     assert calculator.history == []
@@ -230,31 +317,62 @@ def test_clear_history(calculator):
 
 # Test REPL Commands (using patches for input/output handling)
 
-@patch('builtins.input', side_effect=['exit'])
-@patch('builtins.print')
-def test_calculator_repl_exit(mock_print, mock_input):
-    with patch('app.calculator.Calculator.save_history') as mock_save_history:
-        calculator_repl()
-        mock_save_history.assert_called_once()
-        mock_print.assert_any_call("History saved successfully.")
-        mock_print.assert_any_call("Goodbye!")
-
-@patch('builtins.input', side_effect=['help', 'exit'])
-@patch('builtins.print')
-def test_calculator_repl_help(mock_print, mock_input):
-    calculator_repl()
-    mock_print.assert_any_call("\nAvailable commands:")
-
-@patch('builtins.input', side_effect=['add', '2', '3', 'exit'])
-@patch('builtins.print')
-def test_calculator_repl_addition(mock_print, mock_input):
-    calculator_repl()
-    mock_print.assert_any_call("\nResult: 5")
+def assert_prints(out, *expected):
+    # Each expected message must match whole consecutive lines of the captured stdout
+    lines = out.splitlines()
+
+    def printed(message):
+        message_lines = message.split("\n")
+        size = len(message_lines)
+        return any(lines[i:i + size] == message_lines for i in range(len(lines) - size + 1))
+
+    missing = [e for e in expected if not printed(e)]
+    assert not missing, f"missing prints: {missing}"
+
+# (inputs, expected prints, expected save_history calls)
+REPL_CASES = [
+    (['exit'], ["History saved successfully.", "Goodbye!"], 1),
+    (['help', 'exit'], ["\nAvailable commands:"], 1),
+    (['add', '2', '3', 'exit'], ["\nResult: 5"], 1),
+    (['clear', 'history', 'undo', 'redo', 'exit'],
+     ["History cleared", "No calculations in history", "Nothing to undo", "Nothing to redo", "Goodbye!"], 1),
+    (['save', 'load', 'exit'], ["History saved successfully", "History loaded successfully", "Goodbye!"], 2),
+    (['add', 'cancel', 'exit'], ["Operation cancelled"], 1),
+    (['nonsense', 'exit'], ["Unknown command: 'nonsense'. Type 'help' for available commands."], 1),
+]
+
+class TestRepl:
+    # Stub history persistence for every REPL test; no case depends on real saving or loading
+    @pytest.fixture(autouse=True)
+    def _nosave(self):
+        with ExitStack() as stack:
+            mock_save_history = stack.enter_context(patch('app.calculator.Calculator.save_history'))
+            mock_load_history = stack.enter_context(patch('app.calculator.Calculator.load_history'))
+            yield mock_save_history, mock_load_history
+
+    @pytest.mark.parametrize("inputs,expected,saves", REPL_CASES,
+                             ids=['exit', 'help', 'addition', 'history_clear_undo_redo', 'save_load', 'cancel', 'unknown'])
+    def test_calculator_repl_commands(self, inputs, expected, saves, repl_env, _nosave, capsys):
+        mock_save_history, _ = _nosave
+        with patch('builtins.input', side_effect=inputs):
+            calculator_repl()
+        # Every session ends with 'exit', which saves the history once more
+        assert mock_save_history.call_count == saves
+        assert_prints(capsys.readouterr().out, *expected)
+
+    # Test REPL top-level fatal error handling
+    @patch('app.calculator.Calculator.__init__', side_effect=Exception("mocked failure"))
+    def test_calculator_repl_fatal_error(self, mock_init, capsys):
+        with pytest.raises(Exception):
+            calculator_repl()
+        assert_prints(capsys.readouterr().out, "Fatal error: mocked failure")
 
 # --- 1. Test logging setup failure ---
 def test_setup_logging_failure(tmp_path):
     config = CalculatorConfig(base_dir=tmp_path)
-    calc = Calculator(config=config)
+    # Bypass __init__ so the successful setup path does not run first
+    calc = Calculator.__new__(Calculator)
+    calc.config = config
     with patch("app.calculator.os.makedirs", side_effect=PermissionError("no access")):
         with pytest.raises(PermissionError):
             calc._setup_logging()
@@ -262,7 +380,9 @@ def test_setup_logging_failure(tmp_path):
 # --- 2. Test setup_directories failure ---
 def test_setup_directories_failure(tmp_path):
     config = CalculatorConfig(base_dir=tmp_path)
-    calc = Calculator(config=config)
+    # Bypass __init__ so the successful setup path does not run first
+    calc = Calculator.__new__(Calculator)
+    calc.config = config
     with patch("app.calculator.Path.mkdir", side_effect=PermissionError("no permission")):
         with pytest.raises(PermissionError):
             calc._setup_directories()
@@ -270,8 +390,8 @@ def test_setup_directories_failure(tmp_path):
 # --- 3. Test perform_operation generic Exception ---
 def test_perform_operation_generic_exception(calculator):
     calc = calculator
-    mock_operation = MagicMock()
-    mock_operation.execute.side_effect = RuntimeError("boom")
+    mock_operation = Mock(spec=Operation)
+    mock_operation.execute = Mock(side_effect=RuntimeError("boom"))
     calc.set_operation(mock_operation)
     with pytest.raises(OperationError, match="Operation failed"):
         calc.perform_operation(2, 3)
@@ -294,49 +414,3 @@ def test_undo_redo_false(calculator):
     calc = calculator
     assert calc.undo() is False
     assert calc.redo() is False
-
-# --- 9. Test REPL: 'clear', 'history', 'undo', 'redo' ---
-@patch('builtins.input', side_effect=['clear', 'history', 'undo', 'redo', 'exit'])
-@patch('builtins.print')
-def test_calculator_repl_history_clear_undo_redo(mock_print, mock_input):
-    with patch('app.calculator.Calculator.save_history'):
-        calculator_repl()
-        mock_print.assert_any_call("History cleared")
-        mock_print.assert_any_call("No calculations in history")
-        mock_print.assert_any_call("Nothing to undo")
-        mock_print.assert_any_call("Nothing to redo")
-        mock_print.assert_any_call("Goodbye!")
-
-# --- 10. Test REPL: 'save' and 'load' commands ---
-@patch('builtins.input', side_effect=['save', 'load', 'exit'])
-@patch('builtins.print')
-def test_calculator_repl_save_load(mock_print, mock_input):
-    with patch('app.calculator.Calculator.save_history') as mock_save, \
-         patch('app.calculator.Calculator.load_history') as mock_load:
-        calculator_repl()
-        mock_save.assert_called()
-        mock_load.assert_called()
-        mock_print.assert_any_call("History loaded successfully")
-        mock_print.assert_any_call("Goodbye!")
-
-# --- 11. Test REPL: operation canceled ---
-@patch('builtins.input', side_effect=['add', 'cancel', 'exit'])
-@patch('builtins.print')
-def test_calculator_repl_cancel_operation(mock_print, mock_input):
-    calculator_repl()
-    mock_print.assert_any_call("Operation cancelled")
-
-# --- 12. Test REPL: unknown command ---
-@patch('builtins.input', side_effect=['nonsense', 'exit'])
-@patch('builtins.print')
-def test_calculator_repl_unknown_command(mock_print, mock_input):
-    calculator_repl()
-    mock_print.assert_any_call("Unknown command: 'nonsense'. Type 'help' for available commands.")
-
-# --- 13. Test REPL: top-level fatal error handling ---
-@patch('builtins.print')
-@patch('app.calculator.Calculator.__init__', side_effect=Exception("mocked failure"))
-def test_calculator_repl_fatal_error(mock_init, mock_print):
-    with pytest.raises(Exception):
-        calculator_repl()
-    mock_print.assert_any_call("Fatal error: mocked failure")
\ No newline at end of file
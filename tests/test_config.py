@@ -144,3 +144,41 @@ def test_history_file_property():
     config = CalculatorConfig(base_dir=Path('/new_base_dir'))
     assert config.history_file == Path('/new_base_dir/history/calculator_history.csv').resolve()
 
+def test_history_format_env_var():
+    os.environ['CALCULATOR_HISTORY_FORMAT'] = 'Parquet'
+    try:
+        config = CalculatorConfig(base_dir=Path('/new_base_dir'))
+        assert config.history_format == 'parquet'
+    finally:
+        clear_env_vars('CALCULATOR_HISTORY_FORMAT')
+
+def test_history_file_follows_format():
+    clear_env_vars('CALCULATOR_HISTORY_FILE', 'CALCULATOR_HISTORY_DIR')
+    config = CalculatorConfig(base_dir=Path('/new_base_dir'), history_format='feather')
+    assert config.history_file == Path('/new_base_dir/history/calculator_history.feather').resolve()
+
+def test_invalid_history_format():
+    with pytest.raises(ConfigurationError, match="history_format must be one of"):
+        config = CalculatorConfig(history_format='xlsx')
+        config.validate()
+
+def test_assigned_paths_override_environment():
+    os.environ['CALCULATOR_LOG_DIR'] = './env_logs'
+    try:
+        config = CalculatorConfig(base_dir=Path('/new_base_dir'))
+        config.log_dir = Path('/assigned/logs')
+        config.log_file = Path('/assigned/logs/app.log')
+        config.history_dir = Path('/assigned/history')
+        config.history_file = Path('/assigned/history/history.csv')
+        assert config.log_dir == Path('/assigned/logs').resolve()
+        assert config.log_file == Path('/assigned/logs/app.log').resolve()
+        assert config.history_dir == Path('/assigned/history').resolve()
+        assert config.history_file == Path('/assigned/history/history.csv').resolve()
+    finally:
+        clear_env_vars('CALCULATOR_LOG_DIR')
+
+def test_assigned_log_dir_used_for_log_file():
+    clear_env_vars('CALCULATOR_LOG_FILE')
+    config = CalculatorConfig(base_dir=Path('/new_base_dir'))
+    config.log_dir = Path('/assigned/logs')
+    assert config.log_file == Path('/assigned/logs/calculator.log').resolve()